@@ -1,44 +1,104 @@
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-import seaborn as sns
 from IPython.display import display
+from pandas.api.types import union_categoricals
+
+# Use Arrow-backed strings when pyarrow is installed. pandas only picks them by default from 3.0 on.
+try:
+    import pyarrow  # noqa: F401
+    STRING_DTYPE = 'string[pyarrow]'
+except ImportError:
+    STRING_DTYPE = 'string'
+
+# Format string used for all dollar amounts in the report tables.
+CURRENCY_FORMAT = '${:,.2f}'
+
+# Date format used by the Superstore export.
+DATE_FORMAT = '%m/%d/%Y'
+
+# Month names in calendar order, indexed by month number minus one.
+MONTH_NAMES = [
+    'January', 'February', 'March', 'April', 'May', 'June',
+    'July', 'August', 'September', 'October', 'November', 'December'
+]
+
+# Columns read with a fixed dtype. Postal Code is an identifier, so it is read
+# straight into STRING_DTYPE instead of being parsed as a number and cast back.
+CSV_DTYPES = {'Postal Code': STRING_DTYPE}
+
+# Text columns that are stripped and stored as categories when cleaning.
+TEXT_COLS = ['Customer Name', 'Segment', 'Country', 'City', 'State',
+             'Region', 'Category', 'Sub-Category', 'Product Name']
 
 # Loading the dataset.
 def load_sales_data(filepath):
-    return pd.read_csv(filepath, encoding='latin1')
+    return pd.read_csv(filepath, encoding='latin1', dtype=CSV_DTYPES)
+
+# Loads and cleans the sales data chunk by chunk to limit peak memory on large exports.
+def load_clean_sales_data(filepath, chunksize=200_000):
+    chunks = [clean_sales_data(chunk)
+              for chunk in pd.read_csv(filepath, encoding='latin1', dtype=CSV_DTYPES, chunksize=chunksize)]
+
+    # Align categories across chunks so the combined text columns stay categorical,
+    # sorted like the categories clean_sales_data builds from a single frame.
+    for col in TEXT_COLS:
+        categories = union_categoricals([chunk[col] for chunk in chunks], sort_categories=True).categories
+        for chunk in chunks:
+            chunk[col] = chunk[col].cat.set_categories(categories)
+
+    # Drop duplicates that span chunk boundaries.
+    return pd.concat(chunks).drop_duplicates()
+
+# Parses a date column with the known export format, falling back to inference for other formats.
+def _parse_dates(values):
+    try:
+        return pd.to_datetime(values, format=DATE_FORMAT, cache=True)
+    except (ValueError, TypeError):
+        return pd.to_datetime(values, errors='coerce', cache=True)
 
 # Cleans the sales data by removing duplicates, converting dates, and standardizing text columns.
 def clean_sales_data(df):
-    df = df.copy()
+    # Convert date columns. assign returns a new frame, so the caller's data is never modified.
+    df = df.assign(**{
+        'Order Date': _parse_dates(df['Order Date']),
+        'Ship Date': _parse_dates(df['Ship Date']),
+    })
 
-    # Drop duplicates.
-    df.drop_duplicates(inplace=True)
+    # Strip whitespace from text columns and store the repeated values as
+    # categories so grouping works on integer codes.
+    df[TEXT_COLS] = df[TEXT_COLS].astype(STRING_DTYPE).apply(lambda col: col.str.strip()).astype('category')
 
-    # Convert date columns.
-    df['Order Date'] = pd.to_datetime(df['Order Date'], errors='coerce')
-    df['Ship Date'] = pd.to_datetime(df['Ship Date'], errors='coerce')
+    # Drop duplicates on the standardized values, so every load path compares rows the same way.
+    df = df.drop_duplicates()
 
-    # Convert Postal Code to string.
-    df['Postal Code'] = df['Postal Code'].astype(str)
+    # Drop rows with missing key dates or sales info.
+    df = df.dropna(subset=['Order Date', 'Ship Date', 'Sales'])
 
-    # Strip whitespace from text columns.
-    text_cols = ['Customer Name', 'Segment', 'Country', 'City', 'State',
-                 'Region', 'Category', 'Sub-Category', 'Product Name']
-    for col in text_cols:
-        df[col] = df[col].str.strip()
+    # Store Quantity as a 32-bit integer to halve the memory scanned when it is summed.
+    # Missing quantities can't be held in an integer column, so those frames keep the original dtype.
+    if df['Quantity'].notna().all():
+        df['Quantity'] = df['Quantity'].astype('int32')
 
-    # Drop rows with missing key dates or sales info.
-    df.dropna(subset=['Order Date', 'Ship Date', 'Sales'], inplace=True)
+    # Derive the order date parts used by the time-based summaries once.
+    df['Year'] = df['Order Date'].dt.year
+    df['Month'] = df['Order Date'].dt.month
+    df['Order Month'] = df['Order Date'].dt.to_period('M')
 
     return df
 
-# Identifies data issues such as negative sales or invalid discounts.
-def validate_columns(df):
+# Identifies data issues such as negative sales or invalid discounts, returning the row count and first row positions per issue.
+def validate_columns(df, preview_rows=5):
+    discount = df['Discount'].to_numpy()
+    masks = {
+        'negative_sales': df['Sales'].to_numpy() < 0,
+        'invalid_quantity': df['Quantity'].to_numpy() <= 0,
+        'invalid_discount': (discount < 0) | (discount > 1),
+        'extreme_profit': np.abs(df['Profit'].to_numpy()) > 10000,
+    }
     issues = {
-        'negative_sales': df[df['Sales'] < 0],
-        'invalid_quantity': df[df['Quantity'] <= 0],
-        'invalid_discount': df[(df['Discount'] < 0) | (df['Discount'] > 1)],
-        'extreme_profit': df[(df['Profit'] < -10000) | (df['Profit'] > 10000)],
+        issue: (int(mask.sum()), np.flatnonzero(mask)[:preview_rows])
+        for issue, mask in masks.items()
     }
     return issues
 
@@ -46,159 +106,199 @@ def validate_columns(df):
 def report_validation_issues(df):
     validation_results = validate_columns(df)
 
-    for issue, rows in validation_results.items():
-        print(f"\n{issue} — {len(rows)} rows")
-        if not rows.empty:
-            display(rows.head())
+    for issue, (count, positions) in validation_results.items():
+        print(f"\n{issue} — {count} rows")
+        if count:
+            display(df.iloc[positions])
+
+# Replaces missing values with zero so weighted bincounts skip them, as groupby sums do.
+def _nan_to_zero(values):
+    return np.where(pd.isna(values), 0, values)
+
+# Caches factorized key columns so several aggregations share one hash build per key.
+class _AnalysisContext:
+    def __init__(self, df):
+        self.df = df
+        self._factorized = {}
+
+    # Returns the codes and unique values of a key column, factorizing it on first use.
+    def factorize(self, key):
+        if key not in self._factorized:
+            self._factorized[key] = pd.factorize(self.df[key], sort=False)
+        return self._factorized[key]
+
+    # Sums the given columns per key value using weighted bincounts of the cached codes.
+    def grouped_sum(self, key, columns):
+        codes, uniques = self.factorize(key)
+
+        # Rows with a missing key are left out, as groupby does.
+        observed = codes >= 0
+        codes = codes[observed]
+
+        sums = {
+            col: np.bincount(codes, weights=_nan_to_zero(self.df[col].to_numpy()[observed]), minlength=len(uniques))
+            for col in columns
+        }
+        return pd.DataFrame(sums, index=pd.Index(uniques, name=key))
+
+    # Returns the most frequent value of a key column, breaking ties like Series.mode.
+    def mode(self, key):
+        codes, uniques = self.factorize(key)
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        return min(uniques[counts == counts.max()])
+
+# Returns the given analysis context, or a new one for the data frame.
+def _get_context(df, ctx=None):
+    return ctx if ctx is not None else _AnalysisContext(df)
+
+# Returns a Styler that shows the given columns as dollar amounts while keeping the numeric data underneath.
+def _format_currency(frame, columns):
+    return frame.style.format({col: CURRENCY_FORMAT for col in columns})
 
 # Summarizes overall sales performance metrics including totals and averages.
-def sales_performance(df):
+def sales_performance(df, ctx=None):
+    ctx = _get_context(df, ctx)
+
     # Creating a dictionary for the summary.
     summary = {
         'total_sales': df['Sales'].sum(),
         'total_profit': df['Profit'].sum(),
-        'total_orders': df['Order ID'].nunique(),
+        'total_orders': len(ctx.factorize('Order ID')[1]),
         'average_discount': df['Discount'].mean(),
-        'most_common_category': df['Category'].mode()[0],
-        'most_common_region': df['Region'].mode()[0]
+        'most_common_category': ctx.mode('Category'),
+        'most_common_region': ctx.mode('Region')
     }
     # Creating a data frame of the summary.
     summary_df = pd.DataFrame.from_dict(summary, orient='index', columns=['Value'])
     
     # Format specific rows.
-    summary_df.loc['total_sales', 'Value'] = f"${summary['total_sales']:,.2f}"
-    summary_df.loc['total_profit', 'Value'] = f"${summary['total_profit']:,.2f}"
+    summary_df.loc['total_sales', 'Value'] = CURRENCY_FORMAT.format(summary['total_sales'])
+    summary_df.loc['total_profit', 'Value'] = CURRENCY_FORMAT.format(summary['total_profit'])
     summary_df.loc['average_discount', 'Value'] = f"{summary['average_discount']:.2%}"
 
     return summary_df
 
-# Returns the top 10 products ranked by sales, with formatted dollar amounts.
-def top_sales_products(df):
-    top_products = df.groupby('Product Name').agg({'Sales': 'sum', 'Profit': 'sum'}).reset_index()
-    top_products = top_products.sort_values(by='Sales', ascending=False).head(10).reset_index(drop=True)
-    
-    # Add a rank column from 1 to 10.
-    top_products.index = top_products.index + 1
-    top_products.index.name = 'Rank'
+# Aggregates total sales and profit per product, shared by the product rankings.
+def product_totals(df, ctx=None):
+    return _get_context(df, ctx).grouped_sum('Product Name', ['Sales', 'Profit'])
 
-    # Format Profit and Sales as dollar amounts.
-    top_products['Sales'] = top_products['Sales'].apply(lambda x: f"${x:,.2f}")
-    top_products['Profit'] = top_products['Profit'].apply(lambda x: f"${x:,.2f}")
-    
-    return top_products
+# Ranks the top N products by the given column, with formatted dollar amounts.
+def _rank_products(totals, by, top_n=10):
+    other = 'Profit' if by == 'Sales' else 'Sales'
+    top_products = totals.nlargest(top_n, by)[[by, other]].reset_index()
 
-# Returns the top 10 products ranked by profit, with formatted dollar amounts.
-def top_profit_products(df):
-    top_products = df.groupby('Product Name').agg({'Profit': 'sum', 'Sales': 'sum'}).reset_index()
-    top_products = top_products.sort_values(by='Profit', ascending=False).head(10).reset_index(drop=True)
-    
-    # Add a rank column from 1 to 10.
+    # Add a rank column from 1 to N.
     top_products.index = top_products.index + 1
     top_products.index.name = 'Rank'
 
-    # Format Profit and Sales as dollar amounts.
-    top_products['Profit'] = top_products['Profit'].apply(lambda x: f"${x:,.2f}")
-    top_products['Sales'] = top_products['Sales'].apply(lambda x: f"${x:,.2f}")
-    
-    return top_products
+    # Show Profit and Sales as dollar amounts.
+    return _format_currency(top_products, [by, other])
+
+# Returns the top 10 products ranked by sales, with formatted dollar amounts.
+def top_sales_products(df, totals=None):
+    if totals is None:
+        totals = product_totals(df)
+    return _rank_products(totals, 'Sales')
+
+# Returns the top 10 products ranked by profit, with formatted dollar amounts.
+def top_profit_products(df, totals=None):
+    if totals is None:
+        totals = product_totals(df)
+    return _rank_products(totals, 'Profit')
 
 # Summarizes total profit by category, sorted and ranked.
-def profit_per_category(df):
-    profit_by_category = df.groupby('Category').agg({'Profit': 'sum'}).reset_index()
+def profit_per_category(df, ctx=None):
+    profit_by_category = _get_context(df, ctx).grouped_sum('Category', ['Profit']).reset_index()
     profit_by_category = profit_by_category.sort_values(by='Profit', ascending=False).reset_index(drop=True)
     
     # Add a rank column from 1 to N.
     profit_by_category.index = profit_by_category.index + 1
     profit_by_category.index.name = 'Rank'
 
-    # Format Profit as dollar amounts.
-    profit_by_category['Profit'] = profit_by_category['Profit'].apply(lambda x: f"${x:,.2f}")
-    
-    return profit_by_category
+    # Show Profit as dollar amounts.
+    return _format_currency(profit_by_category, ['Profit'])
 
 # Summarizes total profit by sub-category, sorted and ranked.
-def profit_per_subcategory(df):
-    profit_by_subcategory = df.groupby('Sub-Category').agg({'Profit': 'sum'}).reset_index()
+def profit_per_subcategory(df, ctx=None):
+    profit_by_subcategory = _get_context(df, ctx).grouped_sum('Sub-Category', ['Profit']).reset_index()
     profit_by_subcategory = profit_by_subcategory.sort_values(by='Profit', ascending=False).reset_index(drop=True)
     
     # Add a rank column from 1 to N.
     profit_by_subcategory.index = profit_by_subcategory.index + 1
     profit_by_subcategory.index.name = 'Rank'
 
-    # Format Profit as dollar amounts. 
-    profit_by_subcategory['Profit'] = profit_by_subcategory['Profit'].apply(lambda x: f"${x:,.2f}")
-    
-    return profit_by_subcategory
+    # Show Profit as dollar amounts.
+    return _format_currency(profit_by_subcategory, ['Profit'])
+
+# Returns a date part of the time column, using the column precomputed by clean_sales_data when available.
+def _date_part(df, time_col, part):
+    if time_col == 'Order Date' and part in df:
+        return df[part]
+    return getattr(df[time_col].dt, part.lower()).rename(part)
 
 # Aggregates total sales by year with formatted values.
 def sales_over_years(df, time_col='Order Date', agg_col='Sales'):
-    df['Year'] = df[time_col].dt.year
-    trends = df.groupby('Year').agg({agg_col: 'sum'}).reset_index()
+    years = _date_part(df, time_col, 'Year')
+    trends = df.groupby(years).agg({agg_col: 'sum'}).reset_index()
     trends.rename(columns={agg_col: 'Total Sales'}, inplace=True)
     
-    # Format Total Sales as dollar amounts. 
-    trends['Total Sales'] = trends['Total Sales'].apply(lambda x: f"${x:,.2f}")
-    
-    return trends
+    # Show Total Sales as dollar amounts.
+    return _format_currency(trends, ['Total Sales'])
 
 # Aggregates total sales by month with formatted values.
 def sales_over_months(df, time_col='Order Date', agg_col='Sales'):
-    # Extract full month name.
-    df['Month'] = df[time_col].dt.strftime('%B')
+    # Rows with a missing date have no month and are left out, as groupby does.
+    months = _date_part(df, time_col, 'Month').to_numpy()
+    dated = ~pd.isna(months)
+    months = months[dated].astype(np.int64)
 
-    # To ensure months appear in calendar order.
-    month_order = [
-        'January', 'February', 'March', 'April', 'May', 'June',
-        'July', 'August', 'September', 'October', 'November', 'December'
-    ]
-    df['Month'] = pd.Categorical(df['Month'], categories=month_order, ordered=True)
-
-    trends = df.groupby('Month').agg({agg_col: 'sum'}).reset_index()
-    trends.rename(columns={agg_col: 'Total Sales'}, inplace=True)
+    # Sum per month number with a weighted bincount; slot 0 is unused.
+    totals = np.bincount(months, weights=_nan_to_zero(df[agg_col].to_numpy()[dated]), minlength=13)[1:]
+    observed = np.bincount(months, minlength=13)[1:] > 0
 
-    # Format Total Sales as dollar amounts.
-    trends['Total Sales'] = trends['Total Sales'].apply(lambda x: f"${x:,.2f}")
+    # Label the months in calendar order, keeping only months with orders.
+    trends = pd.DataFrame({
+        'Month': pd.Categorical(MONTH_NAMES, categories=MONTH_NAMES, ordered=True),
+        'Total Sales': totals,
+    })[observed].reset_index(drop=True)
 
-    return trends.sort_values('Month')
+    # Show Total Sales as dollar amounts.
+    return _format_currency(trends, ['Total Sales'])
 
 # Provides sales and profit aggregated by state, sorted and formatted.
-def geographic_insights(df):
+def geographic_insights(df, ctx=None):
     # Group by Country and State, aggregating Sales and Profit.
-    geo_insights = df.groupby('State').agg({'Sales': 'sum', 'Profit': 'sum'}).reset_index()
+    geo_insights = _get_context(df, ctx).grouped_sum('State', ['Sales', 'Profit']).reset_index()
     
     # Sort by Sales in descending order
     geo_insights = geo_insights.sort_values(by='Sales', ascending=False).reset_index(drop=True)
     
-    # Format Sales and Profit as dollar amounts.
-    geo_insights['Sales'] = geo_insights['Sales'].apply(lambda x: f"${x:,.2f}")
-    geo_insights['Profit'] = geo_insights['Profit'].apply(lambda x: f"${x:,.2f}")
-    
-    return geo_insights
+    # Show Sales and Profit as dollar amounts.
+    return _format_currency(geo_insights, ['Sales', 'Profit'])
 
 # Summarizes sales and profit by customer segment, sorted and formatted.
-def segment_analysis(df):
+def segment_analysis(df, ctx=None):
     # Group by Segment and aggregate Sales and Profit.
-    segment_summary = df.groupby('Segment').agg({'Sales': 'sum', 'Profit': 'sum'}).reset_index()
+    segment_summary = _get_context(df, ctx).grouped_sum('Segment', ['Sales', 'Profit']).reset_index()
     
     # Sort by Sales in descending order.
     segment_summary = segment_summary.sort_values(by='Sales', ascending=False).reset_index(drop=True)
     
-    # Format Sales and Profit as dollar amounts.
-    segment_summary['Sales'] = segment_summary['Sales'].apply(lambda x: f"${x:,.2f}")
-    segment_summary['Profit'] = segment_summary['Profit'].apply(lambda x: f"${x:,.2f}")
-    
-    return segment_summary
+    # Show Sales and Profit as dollar amounts.
+    return _format_currency(segment_summary, ['Sales', 'Profit'])
 
 # Calculates average, minimum, and maximum order-to-ship times in days.
 def order_to_ship_summary(df):
-    # Subtract the difference between Ship Date and Order Date.
-    shipping_times = df['Ship Date'] - df['Order Date']
+    # Compute the whole days between Order Date and Ship Date once as a NumPy array.
+    # Rows missing either date are left out, as .dt.days statistics skip them.
+    shipping_times = df['Ship Date'].to_numpy() - df['Order Date'].to_numpy()
+    shipping_days = shipping_times[~np.isnat(shipping_times)] // np.timedelta64(1, 'D')
 
-    # Extract the days from the calculations and store in a dictionary.
+    # Store the statistics in a dictionary.
     summary = {
-        'order_to_ship_average' : shipping_times.dt.days.mean(),
-        'order_to_ship_min' : shipping_times.dt.days.min(),
-        'order_to_ship_max' : shipping_times.dt.days.max()
+        'order_to_ship_average' : shipping_days.mean(),
+        'order_to_ship_min' : shipping_days.min(),
+        'order_to_ship_max' : shipping_days.max()
     }
 
     # Return as a DataFrame.
@@ -207,30 +307,44 @@ def order_to_ship_summary(df):
 
 # Summarizes sales, profit, and quantity grouped by discount ranges.
 def get_discount_impact_summary(df):
-    df = df.copy()
-    df['Discount Bin'] = pd.cut(df['Discount'], bins=[0, 0.1, 0.2, 0.3, 0.4, 0.5, 1.0])
-    summary = df.groupby('Discount Bin').agg({
-        'Sales': 'sum',
-        'Profit': 'sum',
-        'Quantity': 'sum'
-    }).reset_index()
-    
+    bins = [0, 0.1, 0.2, 0.3, 0.4, 0.5, 1.0]
+    codes = pd.cut(df['Discount'].to_numpy(), bins=bins, labels=False)
+
+    # Undiscounted and out-of-range rows have no bin and are left out.
+    binned = ~np.isnan(codes)
+    codes = codes[binned].astype(np.int8)
+
+    # Sum each column per bin with a weighted bincount, keeping empty bins.
+    totals = {
+        col: np.bincount(codes, weights=_nan_to_zero(df[col].to_numpy()[binned]), minlength=len(bins) - 1)
+        for col in ['Sales', 'Profit', 'Quantity']
+    }
+    summary = pd.DataFrame({
+        'Discount Bin': pd.Categorical(pd.IntervalIndex.from_breaks(bins), ordered=True),
+        **totals,
+    })
+    summary['Quantity'] = summary['Quantity'].astype(df['Quantity'].dtype)
+
     return summary
 
 # Summarizes average discount and discounted order counts by category and sub-category.
 def category_discount_summary(df):
-    category_discount = df[df['Discount'] > 0].groupby(['Category', 'Sub-Category']).agg({
+    category_discount = df[df['Discount'] > 0].groupby(['Category', 'Sub-Category'], observed=True).agg({
     'Discount': ['mean', 'count']}).sort_values(('Discount', 'mean'), ascending=False)
     category_discount.columns = ['Avg Discount', 'Discounted Orders']
     category_discount.reset_index(inplace=True)
     
     return category_discount
 
-# Plots Discount vs. Profit scatterplot and returns their correlation matrix.
+# Plots Discount vs. Profit as a hexbin density chart and returns their correlation matrix.
 def plot_profit_vs_discount(df):
+    # Bin the points instead of drawing one marker per row, so rendering cost doesn't grow with the data.
     plt.figure(figsize=(8, 6))
-    sns.scatterplot(data=df, x='Discount', y='Profit')
+    plt.hexbin(df['Discount'].to_numpy(), df['Profit'].to_numpy(), gridsize=60, bins='log')
+    plt.colorbar(label='Order lines (log scale)')
     plt.title("Discount vs. Profit")
+    plt.xlabel('Discount')
+    plt.ylabel('Profit')
     plt.show()
     
     # Also check correlation.
@@ -238,8 +352,12 @@ def plot_profit_vs_discount(df):
 
 # Plots monthly sales trend line chart.
 def plot_monthly_sales_trend(df):
-    df['Order Month'] = pd.to_datetime(df['Order Date']).dt.to_period('M')
-    monthly_sales = df.groupby('Order Month')['Sales'].sum()
+    # Use the month precomputed by clean_sales_data, deriving it for other frames.
+    if 'Order Month' in df:
+        order_months = df['Order Month']
+    else:
+        order_months = pd.to_datetime(df['Order Date']).dt.to_period('M').rename('Order Month')
+    monthly_sales = df['Sales'].groupby(order_months).sum()
 
     plt.figure(figsize=(12,6))
     monthly_sales.plot(marker='o')
@@ -252,7 +370,7 @@ def plot_monthly_sales_trend(df):
 
 # Plots a horizontal bar chart of the top N products by sales.
 def plot_top_products_by_sales(df, top_n=10):
-    top_products = df.groupby('Product Name')['Sales'].sum().sort_values(ascending=False).head(top_n)
+    top_products = product_totals(df)['Sales'].nlargest(top_n)
 
     plt.figure(figsize=(10,6))
     top_products.plot(kind='barh')
@@ -263,4 +381,21 @@ def plot_top_products_by_sales(df, top_n=10):
     plt.tight_layout()
     plt.show()
 
-
+# Builds every report table from the cleaned data, reusing shared aggregations between them.
+def build_report(df):
+    ctx = _AnalysisContext(df)
+    totals = product_totals(df, ctx)
+    return {
+        'sales_performance': sales_performance(df, ctx),
+        'top_sales_products': top_sales_products(df, totals),
+        'top_profit_products': top_profit_products(df, totals),
+        'profit_per_category': profit_per_category(df, ctx),
+        'profit_per_subcategory': profit_per_subcategory(df, ctx),
+        'sales_over_years': sales_over_years(df),
+        'sales_over_months': sales_over_months(df),
+        'geographic_insights': geographic_insights(df, ctx),
+        'segment_analysis': segment_analysis(df, ctx),
+        'order_to_ship_summary': order_to_ship_summary(df),
+        'category_discount_summary': category_discount_summary(df),
+        'discount_impact_summary': get_discount_impact_summary(df),
+    }